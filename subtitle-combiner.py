@@ -10,7 +10,7 @@ The main functionality of this script is:
 
 1. User is prompted to input the path to the directory containing the subtitle files. If the path is left empty, the script uses the current working directory.
 
-2. The script will then group all the subtitle files in the directory by their base name and language, assuming that the filename format is 'basename.language.srt'.
+2. The script will then group all the subtitle files in the directory by their base name and language, assuming that the filename format is 'basename.language.srt' (or '.ass'/'.ssa', as saved by subtitle-extractor.py for ASS/SSA tracks). If a language exists in several formats, the .srt file is used.
 
 3. If only one language is found, the script will notify the user and terminate as there are no multiple languages to combine.
 
@@ -30,11 +30,17 @@ Note: This script requires the Python library pysubs2 to be installed. It is use
 """
 
 
+import codecs
+import functools
 import os
+import re
+import sys
 import pysubs2
 from pysubs2 import Alignment, Color, SSAFile, SSAStyle
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
+@functools.lru_cache(maxsize=None)
 def create_style(lang, position):
     return SSAStyle(alignment=position,
                     primarycolor=Color(255, 255, 255),
@@ -43,6 +49,149 @@ def create_style(lang, position):
                     outline=1,
                     fontsize=22 if lang == "JP" else 20)
 
+# Subtitle file extensions the combiner picks up, in order of preference
+SUBTITLE_EXTENSIONS = ('srt', 'ass', 'ssa')
+
+# Fast path for plain SRT input: the same output pysubs2 would produce, written as UTF-8 bytes without building event objects
+ASS_HEADER = (
+    b"[Script Info]\n"
+    b"; Script generated by pysubs2\n"
+    b"; https://pypi.python.org/pypi/pysubs2\n"
+    b"WrapStyle: 0\n"
+    b"ScaledBorderAndShadow: yes\n"
+    b"Collisions: Normal\n"
+    b"ScriptType: v4.00+\n"
+    b"\n"
+    b"[V4+ Styles]\n"
+    b"Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+)
+# Serialized style fields after the name, for each (font size group, position) create_style can produce
+STYLES = {
+    (lang_tag, position): b",Arial,%d,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,1,0,%d,10,10,10,1\n" % (22 if lang_tag == 'JP' else 20, alignment)
+    for lang_tag in ('JP', 'OTHER')
+    for position, alignment in (('top', Alignment.TOP_CENTER), ('bottom', Alignment.BOTTOM_CENTER))
+}
+ASS_EVENTS = (
+    b"\n"
+    b"[Events]\n"
+    b"Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+)
+# One cue between blank lines: optional number, timestamp line, then zero or more text lines
+SRT_CUE = re.compile(rb'(?:[ \t]*\d+[ \t]*\n)?(\d{1,2}):(\d{1,2}):(\d{1,2})[,.](\d{1,3}) --> (\d{1,2}):(\d{1,2}):(\d{1,2})[,.](\d{1,3})[ \t]*(?:\n(.*))?', re.S)
+SRT_NUMBER_LINE = re.compile(rb'[ \t]*\d+[ \t]*\n')
+SRT_MAX_MS = 10 * 3600 * 1000 - 5
+SRT_AMBIGUOUS_LINE = re.compile(rb'^[ \t]*\d*[ \t]*$', re.M)
+
+def srt_time_to_ms(h, m, s, frac):
+    # A short fraction is read the way pysubs2 reads it: "1,5" is 1500 ms
+    return ((int(h) * 60 + int(m)) * 60 + int(s)) * 1000 + int(frac) * 10 ** (3 - len(frac))
+
+def parse_srt_cues(data):
+    data = data.removeprefix(codecs.BOM_UTF8).replace(b'\r\n', b'\n')
+    # Markup needs pysubs2's tag conversion and lone CRs its newline handling, so leave those files to the slow path
+    if b'<' in data or b'{' in data or b'\r' in data:
+        return None
+    # Bytes are copied through as is, so anything that is not UTF-8 must take the slow path
+    try:
+        data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    cues = []
+    blocks = re.split(rb'\n\n+', data.strip())
+    for i, block in enumerate(blocks, start=1):
+        match = SRT_CUE.fullmatch(block)
+        if match is None:
+            return None
+        text = match.group(9) or b''
+        # Whitespace-only, number-only or timestamp-like text lines are ambiguous, so let pysubs2 decide
+        if b'-->' in text or (text and SRT_AMBIGUOUS_LINE.search(text)):
+            return None
+        start, end = srt_time_to_ms(*match.group(1, 2, 3, 4)), srt_time_to_ms(*match.group(5, 6, 7, 8))
+        # ASS timestamps have a single hour digit; pysubs2 clamps anything beyond that
+        if max(start, end) >= SRT_MAX_MS:
+            return None
+        # pysubs2 strips the cue together with the number line of the next cue, so trailing spaces on the
+        # last text line survive only when a numbered cue follows
+        next_numbered = i < len(blocks) and SRT_NUMBER_LINE.match(blocks[i])
+        cues.append((start, end, text.lstrip() if next_numbered else text.strip()))
+    return cues
+
+def read_srt_cues(path):
+    with open(path, 'rb') as f:
+        return parse_srt_cues(f.read())
+
+def ass_timestamp(ms):
+    # Round to centiseconds like pysubs2 (and Aegisub), carrying into seconds/minutes/hours
+    cs = (ms + 5) // 10
+    h, cs = divmod(cs, 360000)
+    m, cs = divmod(cs, 6000)
+    s, cs = divmod(cs, 100)
+    return b"%d:%02d:%02d.%02d" % (h, m, s, cs)
+
+def srt_cues_to_dialogue(cues, style):
+    style = style.encode()
+    lines = []
+    for start, end, text in cues:
+        lines.append(b"Dialogue: 0,%s,%s,%s,,0,0,0,,%s\n" % (ass_timestamp(start), ass_timestamp(end), style, text.replace(b'\n', b'\\N')))
+    return lines
+
+@functools.lru_cache(maxsize=None)
+def shared_styles(top_lang, bottom_lang):
+    # Every episode in a run uses the same style dict; pysubs2 only reads it when saving
+    return {
+        top_lang: create_style(top_lang, Alignment.TOP_CENTER),
+        bottom_lang: create_style(bottom_lang, Alignment.BOTTOM_CENTER)
+    }
+
+def write_combined_ass(top_cues, bottom_cues, top_lang, bottom_lang, output_path):
+    with open(output_path, 'wb') as f:
+        f.write(ASS_HEADER)
+        f.write(b"Style: " + top_lang.encode() + STYLES[('JP' if top_lang == "JP" else 'OTHER', 'top')])
+        f.write(b"Style: " + bottom_lang.encode() + STYLES[('JP' if bottom_lang == "JP" else 'OTHER', 'bottom')])
+        f.write(ASS_EVENTS)
+        f.writelines(srt_cues_to_dialogue(top_cues, top_lang))
+        f.writelines(srt_cues_to_dialogue(bottom_cues, bottom_lang))
+
+def combine_srt_fast(top_path, bottom_path, top_lang, bottom_lang, output_path):
+    top_cues = read_srt_cues(top_path)
+    bottom_cues = read_srt_cues(bottom_path) if top_cues is not None else None
+    if bottom_cues is None:
+        return False
+    write_combined_ass(top_cues, bottom_cues, top_lang, bottom_lang, output_path)
+    return True
+
+def merge_subs(top_subs, bottom_subs, top_lang, bottom_lang, output_path):
+    subs = SSAFile()
+    subs.styles = shared_styles(top_lang, bottom_lang)
+    for e in top_subs.events:
+        e.style = top_lang
+    subs.events.extend(top_subs.events)
+    for e in bottom_subs.events:
+        e.style = bottom_lang
+    subs.events.extend(bottom_subs.events)
+
+    subs.save(output_path)
+
+def combine_srt_data(top_data, bottom_data, top_lang, bottom_lang, output_path):
+    # Same as _combine_one, for SRT bytes that are already in memory (e.g. piped from ffmpeg)
+    top_cues = parse_srt_cues(top_data)
+    bottom_cues = parse_srt_cues(bottom_data) if top_cues is not None else None
+    if bottom_cues is not None:
+        write_combined_ass(top_cues, bottom_cues, top_lang, bottom_lang, output_path)
+        return
+
+    top_subs = SSAFile.from_string(top_data.decode('utf-8-sig'), format_='srt')
+    bottom_subs = SSAFile.from_string(bottom_data.decode('utf-8-sig'), format_='srt')
+    merge_subs(top_subs, bottom_subs, top_lang, bottom_lang, output_path)
+
+def _combine_one(args):
+    top_path, bottom_path, top_lang, bottom_lang, output_path = args
+    if top_path.endswith('.srt') and bottom_path.endswith('.srt'):
+        if combine_srt_fast(top_path, bottom_path, top_lang, bottom_lang, output_path):
+            return
+
+    merge_subs(pysubs2.load(top_path), pysubs2.load(bottom_path), top_lang, bottom_lang, output_path)
+
 def combine_subtitles():
     # Ask for directory
     folder_path = input("Enter the path to your folder (default: current directory): ")
@@ -52,27 +201,37 @@ def combine_subtitles():
     # Group files by base name and language
     subtitles = defaultdict(dict)
     languages = set()
-    for filename in os.listdir(folder_path):
-        if filename.endswith('.srt'):
-            base_name, lang = '.'.join(filename.split('.')[:-2]), filename.split('.')[-2]
-            subtitles[base_name][lang] = filename
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            filename = entry.name
+            parts = filename.rsplit('.', 2)
+            if len(parts) < 3 or parts[2] not in SUBTITLE_EXTENSIONS:
+                continue
+            base_name, lang, extension = parts
+            # If one language exists in several formats, keep the preferred one (SRT can use the fast path)
+            existing = subtitles[base_name].get(lang)
+            if existing is None or SUBTITLE_EXTENSIONS.index(extension) < SUBTITLE_EXTENSIONS.index(existing.rsplit('.', 1)[1]):
+                subtitles[base_name][lang] = filename
             languages.add(lang)
 
+    sorted_langs_str = ', '.join(sorted(languages))
+    sorted_items = sorted(subtitles.items())
+
     # If only one language is found
     if len(languages) == 1:
-        print("\nLanguage found:", ', '.join(sorted(languages)))
+        print("\nLanguage found:", sorted_langs_str)
         print("No more languages can be combined.")
         return
 
     # If only two languages are found
     elif len(languages) == 2:
         lang1, lang2 = languages
-        print("\nLanguages found:", ', '.join(sorted(languages)))
+        print("\nLanguages found:", sorted_langs_str)
         print("Automatically combining these two languages.")
 
     # If more than two languages are found
     else:
-        print("\nLanguages found:", ', '.join(sorted(languages)))
+        print("\nLanguages found:", sorted_langs_str)
         lang1 = input("Enter the first language to combine: ")
         lang2 = input("Enter the second language to combine: ")
 
@@ -91,9 +250,11 @@ def combine_subtitles():
 
     # Preview changes
     print("\nPreview of changes:")
-    for base_name, languages in sorted(subtitles.items()):
+    parts = []
+    for base_name, languages in sorted_items:
         if lang1 in languages and lang2 in languages:
-            print(f"Combining\t{languages[lang1]}\nwith\t\t{languages[lang2]}\n" + "\033[1m" + f"into\t\t{base_name}.{bottom_lang}-{top_lang}.ass" + "\033[0m" + "\n")
+            parts.append(f"Combining\t{languages[lang1]}\nwith\t\t{languages[lang2]}\n\033[1minto\t\t{base_name}.{bottom_lang}-{top_lang}.ass\033[0m\n\n")
+    sys.stdout.write(''.join(parts))
 
     # Confirm changes
     confirm = input("\nAre these changes correct? (y/n) ")
@@ -105,24 +266,17 @@ def combine_subtitles():
     output_folder = os.path.join(folder_path, "Combined Subtitles")
     os.makedirs(output_folder, exist_ok=True)  # Create the output directory if it doesn't exist
 
-    for base_name, languages in sorted(subtitles.items()):
-        if lang1 in languages and lang2 in languages:
-            subs1 = pysubs2.load(os.path.join(folder_path, languages[lang1]))
-            subs2 = pysubs2.load(os.path.join(folder_path, languages[lang2]))
-
-            subs = SSAFile()
-            subs.styles = {
-                top_lang: create_style(top_lang, Alignment.TOP_CENTER),
-                bottom_lang: create_style(bottom_lang, Alignment.BOTTOM_CENTER)
-            }
-            for e in (subs1 if top_lang == lang1 else subs2):
-                e.style = top_lang
-                subs.append(e)
-            for e in (subs1 if top_lang == lang2 else subs2):
-                e.style = bottom_lang
-                subs.append(e)
-
-            subs.save(os.path.join(output_folder, f"{base_name}.{bottom_lang}-{top_lang}.ass"))
+    # Folders are fixed for the whole run, so join paths by prefix instead of os.path.join per episode
+    folder_prefix = os.path.join(folder_path, '')
+    output_prefix = os.path.join(output_folder, '')
+    tasks = [(folder_prefix + languages[top_lang], folder_prefix + languages[bottom_lang], top_lang, bottom_lang,
+              f"{output_prefix}{base_name}.{bottom_lang}-{top_lang}.ass")
+             for base_name, languages in sorted_items
+             if lang1 in languages and lang2 in languages]
+
+    # Parsing is CPU-bound pure Python, so spread episodes across processes
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(_combine_one, tasks))
     print("All changes made successfully.")
 
 if __name__ == "__main__":
@@ -10,7 +10,7 @@ Here is a brief outline of how the script works:
 
 1. The user is prompted to input the path to the directory containing the video files. If the path is left empty, the script uses the current working directory.
 
-2. The script previews the media files found in the specified directory. It handles video files with the following extensions: 'm4v', 'mp4', 'mkv', 'avi'.
+2. The script previews the media files found in the specified directory. It handles video files with the following extensions (case-insensitive): 'm4v', 'mp4', 'mkv', 'avi'.
 
 3. The user is asked to confirm whether the fetched media files are correct. If not, the script aborts the operation.
 
@@ -20,49 +20,212 @@ Here is a brief outline of how the script works:
 
 6. The script creates a directory named "Extracted Subtitles" in the specified directory to store the extracted subtitle files.
 
-7. For each video file and selected language, the script extracts the respective subtitle stream using ffmpeg and saves it as an .srt file in the "Extracted Subtitles" directory. The output files are named in the format "basename.language.srt", where "basename" is the name of the original video file and "language" is the ISO 639-1 language code.
+7. For each video file and selected language, the script extracts the respective subtitle stream using ffmpeg and saves it as an .srt file in the "Extracted Subtitles" directory. The output files are named in the format "basename.language.srt", where "basename" is the name of the original video file and "language" is the ISO 639-1 language code. SubRip and ASS tracks are copied without conversion, SSA tracks are converted to ASS (both are saved as .ass), and image-based tracks such as PGS or VobSub are skipped.
 
-8. Upon completion, the script prints a summary of the extracted subtitles, indicating the language, original video file, and output .srt filename for each extracted subtitle.
+8. Upon completion, the script prints a summary of the extracted subtitles, indicating the language, original video file, and output subtitle filename for each extracted subtitle.
 
 Note: The script requires ffmpeg to be installed and accessible in the system's PATH. It also uses a mapping from ISO 639-2 to ISO 639-1 language codes for the naming of the output files. If a language is not included in this mapping, the script defaults to using the first two characters of the ISO 639-2 code.
+
+With --pipe, exactly two languages are selected and both tracks of each video are read in a single ffmpeg run (one on stdout, one on an extra pipe, so this mode needs a POSIX system) and streamed straight into subtitle-combiner.py's SRT parser, saving 'basename.language1-language2.ass' files to "Combined Subtitles" without writing intermediate .srt files. This mode requires pysubs2, like the combiner.
 """
 
 
+import argparse
+import asyncio
+import importlib.util
 import os
-import json
+import re
 import subprocess
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # ISO 639-2 to ISO 639-1 language codes mapping
 iso639_mapping = {'eng': 'en', 'jpn': 'ja', 'spa': 'es', 'fre': 'fr', 'deu': 'de', 'ita': 'it', 'dut': 'nl', 'por': 'pt', 'rus': 'ru', 'kor': 'ko', 'chi': 'zh'}
 
+# Output codes already resolved this run, including the two-letter fallback for unmapped languages
+_ISO_CACHE = {}
+
+def iso2(lang, _c=_ISO_CACHE, _m=iso639_mapping):
+    v = _c.get(lang)
+    if v is None:
+        v = _c[lang] = _m.get(lang, lang[:2])
+    return v
+
+VIDEO_EXTENSIONS = frozenset({'.m4v', '.mp4', '.mkv', '.avi'})
+
+NUMBER_PATTERN = re.compile(r'\d+')
+
+# Output (extension, ffmpeg subtitle codec) per source codec. Tracks are only stream-copied when the target muxer
+# accepts the codec as is: the ASS muxer takes 'ass' but not 'ssa', so SSA is converted. Other text codecs become SRT.
+OUTPUT_FORMATS = {'subrip': ('srt', 'copy'), 'ass': ('ass', 'copy'), 'ssa': ('ass', 'ass')}
+DEFAULT_OUTPUT_FORMAT = ('srt', 'srt')
+# Bitmap subtitles cannot be converted to text, so they are never extracted
+IMAGE_CODECS = frozenset({'hdmv_pgs_subtitle', 'dvd_subtitle', 'dvb_subtitle', 'xsub'})
+
+# ffprobe results keyed by filename, so each file is only probed once per run
+_probe_cache = {}
+
+# C-style escapes used by ffprobe's compact printer; any other escaped character stands for itself
+COMPACT_ESCAPES = {'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r'}
+
+def parse_compact_stream(line):
+    # ffprobe's compact printer emits "key=value|key=value|..." per stream, escaping "|", "\\" and control characters with a backslash
+    stream = {'tags': {}}
+    for field in re.findall(r'(?:\\.|[^\\|\r\n])+', line):
+        key, _, value = field.partition('=')
+        value = re.sub(r'\\(.)', lambda m: COMPACT_ESCAPES.get(m.group(1), m.group(1)), value)
+        if key == 'index':
+            stream['index'] = int(value)
+        elif key == 'codec_name':
+            stream['codec_name'] = value
+        elif key.startswith('tag:') and key[4:] in ('language', 'title'):
+            stream['tags'][key[4:]] = value
+    return stream
+
+def probe_command(filename):
+    return ['ffprobe', '-v', 'quiet', '-print_format', 'compact=p=0', '-show_entries', 'stream=index,codec_name:stream_tags=language,title', '-select_streams', 's', filename]
+
 def get_subtitle_streams(filename):
-    result = subprocess.run(['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', '-select_streams', 's', filename], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    return json.loads(result.stdout)
+    # Filled by probe_all before the streams are read
+    return _probe_cache[filename]
+
+async def probe_subtitle_streams(filename, semaphore):
+    async with semaphore:
+        proc = await asyncio.create_subprocess_exec(*probe_command(filename), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        # Parse ffprobe's output line by line as it arrives; it is UTF-8 regardless of the locale
+        streams = [parse_compact_stream(line.decode('utf-8', 'replace')) async for line in proc.stdout if line.strip()]
+        await proc.wait()
+    _probe_cache[filename] = {'streams': streams}
+
+def probe_all(filenames, max_concurrency=8):
+    # ffprobe time is mostly container open and seek latency, so run several at once to fill the cache
+    async def run():
+        semaphore = asyncio.Semaphore(max_concurrency)
+        await asyncio.gather(*(probe_subtitle_streams(filename, semaphore) for filename in filenames if filename not in _probe_cache))
+    asyncio.run(run())
 
-def extract_subtitle(stream, filename, output_filename):
-    mapping = stream['index']
-    command = ['ffmpeg', '-i', filename, '-map', f'0:{mapping}', '-y', '-nostats', '-loglevel', '0', output_filename]
+def extract_subtitles_batch(streams_and_outputs, filename):
+    # One ffmpeg run per video: each selected stream gets its own -map/output pair
+    command = ['ffmpeg', '-nostdin', '-y', '-nostats', '-loglevel', '0', '-i', filename]
+    for stream, output_filename in streams_and_outputs:
+        _, codec = OUTPUT_FORMATS.get(stream.get('codec_name'), DEFAULT_OUTPUT_FORMAT)
+        command += ['-map', f"0:{stream['index']}", '-c:s', codec, output_filename]
     subprocess.run(command)
 
+def srt_output_args(stream):
+    codec = 'copy' if stream.get('codec_name') == 'subrip' else 'srt'
+    return ['-map', f"0:{stream['index']}", '-c:s', codec, '-f', 'srt']
+
+def read_file_descriptor(fd):
+    with open(fd, 'rb') as f:
+        return f.read()
+
+def read_subtitle_pair(first, second, filename):
+    # Both tracks come out of one ffmpeg run so the container is only read once: the first track on stdout,
+    # the second on an extra pipe handed to ffmpeg as pipe:<fd>
+    read_fd, write_fd = os.pipe()
+    command = ['ffmpeg', '-nostdin', '-nostats', '-loglevel', '0', '-i', filename]
+    command += srt_output_args(first) + ['pipe:1'] + srt_output_args(second) + [f'pipe:{write_fd}']
+    with subprocess.Popen(command, stdout=subprocess.PIPE, pass_fds=(write_fd,)) as proc:
+        os.close(write_fd)
+        # Drain the extra pipe on its own thread; ffmpeg interleaves its writes and would block on a full pipe
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            second_data = reader.submit(read_file_descriptor, read_fd)
+            first_data = proc.stdout.read()
+            return first_data, second_data.result()
+
+def load_combiner():
+    # subtitle-combiner.py is not an importable module name, so load it from its path next to this script
+    spec = importlib.util.spec_from_file_location('subtitle_combiner', Path(__file__).with_name('subtitle-combiner.py'))
+    combiner = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(combiner)
+    return combiner
+
+def combine_piped(folder_path, tagged_streams, languages):
+    if os.name != 'posix':
+        print("Error: --pipe needs extra pipes to ffmpeg, which are only available on POSIX systems.")
+        return
+
+    languages = list(dict.fromkeys(languages))
+    if len(languages) != 2:
+        print("Error: --pipe combines exactly two languages.")
+        return
+
+    lang1, lang2 = languages
+    # Output codes name both the styles and the file, so two tracks of one language cannot be told apart
+    codes = {lang_title: iso2(lang) for _, _, lang, lang_title in tagged_streams}
+    if codes[lang1] == codes[lang2]:
+        print(f"Error: {lang1} and {lang2} are the same language ({codes[lang1]}) and cannot be combined.")
+        return
+
+    top_lang = input(f"Which language should be on top ({lang1}/{lang2}): ")
+    if top_lang not in {lang1, lang2}:
+        print("Invalid input.")
+        return
+    bottom_lang = lang2 if top_lang == lang1 else lang1
+
+    # First matching stream of each selected language, per video
+    streams_by_file = defaultdict(dict)
+    for video_file, stream, lang, lang_title in tagged_streams:
+        if lang_title in (top_lang, bottom_lang) and stream.get('codec_name') not in IMAGE_CODECS:
+            streams_by_file[video_file].setdefault(lang_title, (stream, iso2(lang)))
+
+    output_dir = Path(folder_path) / "Combined Subtitles"
+    output_dir.mkdir(exist_ok=True)
+
+    combiner = load_combiner()
+    summary = []
+
+    def combine_one(video_file, top, bottom, output_filename):
+        top_data, bottom_data = read_subtitle_pair(top[0], bottom[0], str(video_file))
+        combiner.combine_srt_data(top_data, bottom_data, top[1], bottom[1], str(output_dir / output_filename))
+
+    jobs = []
+    for video_file, found in sorted(streams_by_file.items()):
+        if top_lang in found and bottom_lang in found:
+            top, bottom = found[top_lang], found[bottom_lang]
+            output_filename = f"{video_file.stem}.{bottom[1]}-{top[1]}.ass"
+            jobs.append((video_file, top, bottom, output_filename))
+            summary.append((video_file.stem, output_filename))
+
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as executor:
+            futures = [executor.submit(combine_one, *job) for job in jobs]
+            for future in as_completed(futures):
+                future.result()
+
+    print("\nSubtitle extraction and combination complete.\n")
+    print(f"Saved {len(summary)} subtitles to {output_dir}/.\n")
+    print("Summary:")
+    sys.stdout.write(''.join(f"Subtitles from '{base_name}'\n    -> '{output_filename}'\n" for base_name, output_filename in summary))
+
 def ask_languages(lang_title_list):
+    lang_title_set = set(lang_title_list)
     while True:
         lang_input = input("Enter languages to extract (numbers or names, separated by spaces): ").split()
-        languages = [lang_title_list[int(i)-1] if i.isdigit() else i for i in lang_input]
-        invalid_inputs = [lang_title for lang_title in languages if lang_title not in lang_title_list]
+        languages = []
+        for token in lang_input:
+            # Numbers outside the list are kept as typed so they are reported as invalid
+            if NUMBER_PATTERN.fullmatch(token) and 1 <= int(token) <= len(lang_title_list):
+                languages.append(lang_title_list[int(token)-1])
+            else:
+                languages.append(token)
+        invalid_inputs = [lang_title for lang_title in languages if lang_title not in lang_title_set]
         if invalid_inputs:
             print(f"Error: {', '.join(invalid_inputs)} is not a valid language. Please try again.")
         else:
             return languages
 
-def extract_subtitles():
+def extract_subtitles(pipe=False):
     # Ask for directory
     folder_path = input("Enter the path to your folder (enter: current directory): ")
     if not folder_path:
         folder_path = os.getcwd()
 
-    extensions = ['m4v', 'mp4', 'mkv', 'avi']
-    video_files = [f for f in Path(folder_path).iterdir() if f.suffix[1:] in extensions]
+    with os.scandir(folder_path) as entries:
+        video_files = [Path(entry.path) for entry in entries if os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS]
 
     # Preview of found media files
     print(f"\nPath: {folder_path}\n")
@@ -75,15 +238,19 @@ def extract_subtitles():
         print("Aborted.")
         return
 
-    # Fetch subtitle languages
+    # Fetch subtitle languages, remembering each tagged stream for the extraction pass
     lang_title_set = set()
+    tagged_streams = []
+    probe_all([str(video_file) for video_file in video_files])
     for video_file in video_files:
         streams = get_subtitle_streams(str(video_file))
         for stream in streams['streams']:
             if 'language' in stream['tags']:
                 lang = stream['tags']['language']
                 title = stream['tags'].get('title', '')
-                lang_title_set.add(f"{lang}-{title}" if title else lang)
+                lang_title = f"{lang}-{title}" if title else lang
+                lang_title_set.add(lang_title)
+                tagged_streams.append((video_file, stream, lang, lang_title))
 
     print("\nThe following languages were found:")
     lang_title_list = sorted(lang_title_set)
@@ -92,32 +259,58 @@ def extract_subtitles():
 
     languages = ask_languages(lang_title_list)
 
+    if pipe:
+        combine_piped(folder_path, tagged_streams, languages)
+        return
+
     output_dir = Path(folder_path) / "Extracted Subtitles"
     output_dir.mkdir(exist_ok=True)
 
-    summary = []
+    selected = set(languages)
+    skipped = sum(1 for _, stream, _, lang_title in tagged_streams if lang_title in selected and stream.get('codec_name') in IMAGE_CODECS)
 
-    for video_file in video_files:
-        streams = get_subtitle_streams(str(video_file))
-        base_name = video_file.stem
-        for stream in streams['streams']:
-            if 'language' in stream['tags']:
-                lang = stream['tags']['language']
-                title = stream['tags'].get('title', '')
-                lang_title = f"{lang}-{title}" if title else lang
-                if lang_title in languages:
-                    output_lang = iso639_mapping.get(lang, lang[:2])
-                    output_filename = f"{base_name}.{output_lang}.srt"
-                    extract_subtitle(stream, str(video_file), str(output_dir / output_filename))
-                    summary.append((lang_title, base_name, output_filename))
+    # Tracks of the same language share an output name (e.g. eng-Full and eng-Signs), and two outputs of
+    # one ffmpeg run must not write the same file, so only the first track per name is extracted
+    tasks = []
+    output_names = set()
+    duplicates = []
+    for video_file, stream, lang, lang_title in tagged_streams:
+        if lang_title not in selected or stream.get('codec_name') in IMAGE_CODECS:
+            continue
+        output_filename = f"{video_file.stem}.{iso2(lang)}.{OUTPUT_FORMATS.get(stream.get('codec_name'), DEFAULT_OUTPUT_FORMAT)[0]}"
+        if output_filename in output_names:
+            duplicates.append((lang_title, video_file.stem, output_filename))
+            continue
+        output_names.add(output_filename)
+        tasks.append((video_file, stream, output_filename, lang_title))
+    summary = [(lang_title, video_file.stem, output_filename) for video_file, _, output_filename, lang_title in tasks]
+
+    # Group selected streams per video so each file needs a single ffmpeg run
+    jobs = defaultdict(list)
+    for video_file, stream, output_filename, _ in tasks:
+        jobs[str(video_file)].append((stream, str(output_dir / output_filename)))
+
+    # ffmpeg runs are I/O-bound, so overlap them across files; keep the pool small to spare spinning disks
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as executor:
+            futures = [executor.submit(extract_subtitles_batch, streams_and_outputs, filename) for filename, streams_and_outputs in jobs.items()]
+            for future in as_completed(futures):
+                future.result()
 
     print("\nSubtitle extraction complete.\n")
     print(f"Saved {len(summary)} subtitles to {output_dir}/.\n")
+    if skipped:
+        print(f"Skipped {skipped} image-based subtitles that cannot be saved as text.\n")
+    if duplicates:
+        print(f"Skipped {len(duplicates)} subtitles whose output file was already taken by another track of the same language:")
+        sys.stdout.write(''.join(f"Subtitle '{lang_title}' from '{base_name}' (-> '{output_filename}')\n" for lang_title, base_name, output_filename in duplicates))
+        print()
     print("Summary:")
-    for lang_title, base_name, output_filename in summary:
-        print(f"Subtitle '{lang_title}' from '{base_name}'")
-        print(f"    -> '{output_filename}'")
+    sys.stdout.write(''.join(f"Subtitle '{lang_title}' from '{base_name}'\n    -> '{output_filename}'\n" for lang_title, base_name, output_filename in summary))
 
 
 if __name__ == "__main__":
-    extract_subtitles()
+    parser = argparse.ArgumentParser(description="Extract subtitle streams from video files.")
+    parser.add_argument('--pipe', action='store_true', help="combine two selected languages into .ass files directly, without writing intermediate .srt files")
+    args = parser.parse_args()
+    extract_subtitles(pipe=args.pipe)
@@ -0,0 +1,43 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+pysubs2 = pytest.importorskip("pysubs2")
+
+spec = importlib.util.spec_from_file_location("subtitle_combiner", Path(__file__).parent.parent / "subtitle-combiner.py")
+combiner = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(combiner)
+
+OTHER_SRT = "1\n00:00:05,000 --> 00:00:06,000\nOther\n"
+
+
+@pytest.mark.parametrize("srt", [
+    # Empty cue followed by a blank line
+    "1\n00:00:01,000 --> 00:00:02,000\n\n2\n00:00:03,000 --> 00:00:04,000\nSecond\n",
+    # Milliseconds that round up into the next second
+    "1\n00:00:01,999 --> 00:59:59,996\nRounded\n",
+    # Millisecond field shorter than 3 digits
+    "1\n00:00:01,5 --> 00:00:02,25\nShort\n",
+    # Unnumbered cues with a trailing space on the last text line
+    "00:00:01,000 --> 00:00:02,000\nHello \n\n00:00:03,000 --> 00:00:04,000\nBye\n",
+])
+def test_fast_path_matches_pysubs2(tmp_path, srt):
+    top = tmp_path / "ep.ja.srt"
+    bottom = tmp_path / "ep.en.srt"
+    top.write_text(srt, encoding="utf-8")
+    bottom.write_text(OTHER_SRT, encoding="utf-8")
+
+    fast = tmp_path / "fast.ass"
+    slow = tmp_path / "slow.ass"
+    assert combiner.combine_srt_fast(str(top), str(bottom), "ja", "en", str(fast))
+    combiner.merge_subs(pysubs2.load(str(top)), pysubs2.load(str(bottom)), "ja", "en", str(slow))
+
+    assert fast.read_bytes() == slow.read_bytes()
+
+
+def test_fast_path_rejects_non_utf8(tmp_path):
+    top = tmp_path / "ep.fr.srt"
+    top.write_bytes("1\n00:00:01,000 --> 00:00:02,000\nDéjà vu\n".encode("cp1252"))
+
+    assert combiner.parse_srt_cues(top.read_bytes()) is None